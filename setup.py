@@ -28,6 +28,10 @@ setup(
     install_requires=[
         "graphviz>=0.20.0",
     ],
+    extras_require={
+        "stream": ["ijson>=3.1"],
+        "fast": ["orjson>=3.6"],
+    },
     entry_points={
         "console_scripts": [
             "terravisualizer=terravisualizer.cli:main",
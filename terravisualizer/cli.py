@@ -5,8 +5,7 @@ import sys
 from pathlib import Path
 
 from terravisualizer.config_parser import load_config
-from terravisualizer.plan_parser import parse_terraform_plan
-from terravisualizer.visualizer import generate_diagram
+from terravisualizer.plan_parser import parse_terraform_plan, stream_unavailable_reason
 
 
 def main():
@@ -40,6 +39,23 @@ def main():
         default=None,
         help="Title for the diagram (default: auto-generated run number based on timestamp)",
     )
+    parser.add_argument(
+        "--engine",
+        default="dot",
+        choices=["dot", "sfdp"],
+        help="Graphviz layout engine; sfdp is faster for very large plans (default: dot)",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Use straight edges and fewer layout iterations for a faster layout of large plans",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the plan with ijson to lower memory use on very large plans (slower to parse); "
+             "needs ijson with a compiled backend, otherwise a warning is printed and the plan is loaded at once",
+    )
 
     args = parser.parse_args()
 
@@ -82,12 +98,22 @@ def main():
         config = load_config(str(config_file))
 
         # Parse Terraform plan
+        if args.stream:
+            reason = stream_unavailable_reason()
+            if reason:
+                print(f"Warning: --stream ignored, {reason}; loading the plan at once", file=sys.stderr)
         print(f"Parsing Terraform plan from {args.file}...")
-        resources = parse_terraform_plan(args.file)
+        resources = parse_terraform_plan(args.file, stream=args.stream)
 
         # Generate diagram
+        # Imported lazily so --help and early validation errors skip loading graphviz
+        from terravisualizer.visualizer import generate_diagram
+
         print(f"Generating diagram...")
-        output_path = generate_diagram(resources, config, args.output, args.format, args.title)
+        output_path = generate_diagram(
+            resources, config, args.output, args.format, args.title,
+            engine=args.engine, fast=args.fast
+        )
 
         print(f"Diagram generated successfully: {output_path}")
 
@@ -3,112 +3,177 @@
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
+# Precompiled patterns for the HCL-like config format
+_COMMENT_RE = re.compile(r'(?:#|//).*$', re.MULTILINE)
+_RESOURCE_HEADER_RE = re.compile(r'"([^"]+)"\s*\{')
+_BLOCK_RE = re.compile(r'"([^"]+)"\s*\{((?:[^{}"]|"(?:[^"\\]|\\.)*")*)\}')
 
-def parse_hcl_to_dict(content: str) -> Dict[str, Any]:
+
+def _split_kv_line(line: str) -> Optional[Tuple[str, str]]:
     """
-    Parse a simplified HCL-like configuration format to a dictionary.
+    Split a '"key" = value' line into its key and value.
     
-    This is a simplified parser that handles the specific format:
-    {
-        "resource_type" {
-            "grouped_by" = [values.project, values.region]
-            "diagram_image" = "path/to/icon"
-            "name" = "value.name"
-        }
-    }
+    Args:
+        line: A stripped line from a resource block
+        
+    Returns:
+        Tuple of (key, value), or None if the line is not a key-value pair
     """
-    config = {}
+    if not line.startswith('"'):
+        return None
     
-    # Remove comments
-    content = re.sub(r'#.*$', '', content, flags=re.MULTILINE)
-    content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)
+    end_quote = line.find('"', 1)
+    if end_quote <= 1:
+        return None
     
-    # Find resource blocks - use a more careful approach
-    # Pattern: "resource_type" { ... }
-    # We need to handle nested braces properly
+    rest = line[end_quote + 1:].lstrip()
+    if not rest.startswith('='):
+        return None
     
-    resource_pattern = r'"([^"]+)"\s*\{'
+    value = rest[1:].strip()
+    if not value:
+        return None
     
-    matches = list(re.finditer(resource_pattern, content))
+    return line[1:end_quote], value
+
+
+def _scan_blocks(content: str) -> List[Tuple[str, str]]:
+    """
+    Find resource blocks by scanning for matching braces.
+    
+    Slower than _BLOCK_RE, but handles nested braces.
+    
+    Args:
+        content: Config content with comments removed
+        
+    Returns:
+        List of (resource_type, block_content) tuples
+    """
+    blocks = []
+    content_len = len(content)
+    
+    # Resume header matching after each block so braces and quotes inside a
+    # block are only ever scanned once, by the forward pass below
+    block_end = 0
     
-    for i, match in enumerate(matches):
+    for match in _RESOURCE_HEADER_RE.finditer(content):
+        if match.start() < block_end:
+            continue
+        
         resource_type = match.group(1)
         start_pos = match.end()
         
-        # Find the matching closing brace
+        # Find the matching closing brace in a single forward pass,
+        # tracking whether we are inside a string literal
         brace_count = 1
-        pos = start_pos
-        while pos < len(content) and brace_count > 0:
-            if content[pos] == '{':
-                # Check if it's inside a string
-                # Simple check: count quotes before this position
-                look_back = pos - 1
-                quote_count = 0
-                while look_back >= start_pos:
-                    if content[look_back] == '"' and (look_back == 0 or content[look_back-1] != '\\'):
-                        quote_count += 1
-                    look_back -= 1
-                if quote_count % 2 == 0:  # Even number of quotes means we're outside strings
+        in_string = False
+        escape = False
+        end_pos = content_len
+        for pos in range(start_pos, content_len):
+            c = content[pos]
+            if escape:
+                escape = False
+            elif c == '\\' and in_string:
+                escape = True
+            elif c == '"':
+                in_string = not in_string
+            elif not in_string:
+                if c == '{':
                     brace_count += 1
-            elif content[pos] == '}':
-                # Check if it's inside a string
-                # Simple check: count quotes before this position
-                look_back = pos - 1
-                quote_count = 0
-                while look_back >= start_pos:
-                    if content[look_back] == '"' and (look_back == 0 or content[look_back-1] != '\\'):
-                        quote_count += 1
-                    look_back -= 1
-                if quote_count % 2 == 0:  # Even number of quotes means we're outside strings
+                elif c == '}':
                     brace_count -= 1
-            pos += 1
+                    if brace_count == 0:
+                        end_pos = pos
+                        break
+        
+        blocks.append((resource_type, content[start_pos:end_pos]))
+        block_end = end_pos
+    
+    return blocks
+
+
+def _parse_block(block_content: str) -> Dict[str, Any]:
+    """
+    Parse the key-value pairs of a single resource block.
+    
+    Args:
+        block_content: Text between the braces of a resource block
         
-        block_content = content[start_pos:pos-1]
+    Returns:
+        Configuration dictionary for the resource type
+    """
+    resource_config = {}
+    
+    # Parse key-value pairs line by line
+    lines = block_content.splitlines()
+    j = 0
+    while j < len(lines):
+        line = lines[j].strip()
         
-        resource_config = {}
+        # Skip empty lines
+        if not line:
+            j += 1
+            continue
         
-        # Parse key-value pairs line by line
-        lines = block_content.strip().split('\n')
-        j = 0
-        while j < len(lines):
-            line = lines[j].strip()
+        # Match key = value pattern
+        kv = _split_kv_line(line)
+        if kv:
+            key, value = kv
             
-            # Skip empty lines
-            if not line:
-                j += 1
-                continue
-            
-            # Match key = value pattern
-            kv_match = re.match(r'"([^"]+)"\s*=\s*(.+)', line)
-            if kv_match:
-                key = kv_match.group(1)
-                value = kv_match.group(2).strip()
-                
-                # Parse array values
-                if value.startswith('['):
-                    # Check if array is complete on this line
-                    if not value.endswith(']'):
-                        # Multi-line array (unlikely in our case, but handle it)
+            # Parse array values
+            if value.startswith('['):
+                # Check if array is complete on this line
+                if not value.endswith(']'):
+                    # Multi-line array (unlikely in our case, but handle it)
+                    j += 1
+                    while j < len(lines) and not value.endswith(']'):
+                        value += ' ' + lines[j].strip()
                         j += 1
-                        while j < len(lines) and not value.endswith(']'):
-                            value += ' ' + lines[j].strip()
-                            j += 1
-                    
-                    # Extract array elements
-                    array_content = value[1:-1]
-                    # Split by comma, handling nested structures
-                    elements = [elem.strip() for elem in array_content.split(',')]
-                    resource_config[key] = elements
-                else:
-                    # Remove quotes from string values
-                    value = value.strip('"\'')
-                    resource_config[key] = value
-            
-            j += 1
+                
+                # Extract array elements
+                array_content = value[1:-1]
+                # Split by comma, handling nested structures
+                elements = [elem.strip() for elem in array_content.split(',')]
+                resource_config[key] = elements
+            else:
+                # Remove quotes from string values
+                value = value.strip('"\'')
+                resource_config[key] = value
         
-        config[resource_type] = resource_config
+        j += 1
+    
+    return resource_config
+
+
+def parse_hcl_to_dict(content: str) -> Dict[str, Any]:
+    """
+    Parse a simplified HCL-like configuration format to a dictionary.
+    
+    This is a simplified parser that handles the specific format:
+    {
+        "resource_type" {
+            "grouped_by" = [values.project, values.region]
+            "diagram_image" = "path/to/icon"
+            "name" = "value.name"
+        }
+    }
+    """
+    config = {}
+    
+    # Remove comments
+    content = _COMMENT_RE.sub('', content)
+    
+    # Find resource blocks: "resource_type" { ... }
+    # The documented format has no nested braces, so try a single regex first
+    # and fall back to the brace scanner if some headers were not matched.
+    blocks = [match.groups() for match in _BLOCK_RE.finditer(content)]
+    if len(blocks) != len(_RESOURCE_HEADER_RE.findall(content)):
+        blocks = _scan_blocks(content)
+    
+    for resource_type, block_content in blocks:
+        config[resource_type] = _parse_block(block_content)
     
     return config
 
@@ -132,8 +197,9 @@ def load_config(config_path: str) -> Dict[str, Any]:
     with open(path, 'r') as f:
         content = f.read()
     
-    # Try JSON first
-    if path.suffix == '.json':
+    # Try JSON first, but skip it for content that cannot be JSON; '{'-wrapped
+    # HCL-like content still goes through a failed json.loads first
+    if path.suffix == '.json' and content.lstrip()[:1] in ('{', '['):
         try:
             config = json.loads(content)
         except json.JSONDecodeError:
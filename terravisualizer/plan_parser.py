@@ -1,12 +1,51 @@
 """Terraform plan JSON parser."""
 
 import json
-from typing import Any, Dict, List
+import sys
+import types
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Why streaming is unavailable, or None if parse_terraform_plan can stream
+_STREAM_UNAVAILABLE_REASON: Optional[str] = None
+try:
+    import ijson
+    # The pure-Python backend is many times slower than loading the whole plan
+    if ijson.backend == "python":
+        ijson = None
+        _STREAM_UNAVAILABLE_REASON = "ijson only has its pure-Python backend"
+except ImportError:  # optional dependency, fall back to loading the whole plan
+    ijson = None
+    _STREAM_UNAVAILABLE_REASON = "ijson is not installed"
+
+try:
+    import orjson
+except ImportError:  # optional dependency, fall back to the stdlib parser
+    orjson = None
+
+# Integers wider than 64 bits have 20+ digits, and orjson silently turns them
+# into floats. Mapping every digit to b"0" and everything else to b" " lets a
+# plain substring search find such runs; a run inside a string value or a
+# fraction is a false positive that only costs a json.loads.
+_DIGITS_TO_ZERO = bytes(0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256))
+_WIDE_INT_DIGITS = b"0" * 20
+
+# Shared read-only values for resources without any values. Anything that
+# needs to add values (see _merge_by_address) must replace it with a new dict.
+_EMPTY_VALUES = types.MappingProxyType({})
+
+
+@lru_cache(maxsize=256)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a dot-separated value path, cached since paths come from the config."""
+    return tuple(path.split("."))
 
 
 class Resource:
     """Represents a Terraform resource."""
 
+    __slots__ = ("resource_type", "name", "values", "address", "_value_cache")
+
     def __init__(self, resource_type: str, name: str, values: Dict[str, Any], address: str = None):
         """
         Initialize a resource.
@@ -19,11 +58,14 @@ class Resource:
                      If not provided, defaults to "{resource_type}.{name}".
                      The address from Terraform plan JSON is always well-formed and safe to use.
         """
-        self.resource_type = resource_type
+        # Types repeat across many resources; interning keeps one copy of each
+        self.resource_type = sys.intern(resource_type) if resource_type else resource_type
         self.name = name
         self.values = values
         # Use provided address (from Terraform JSON) or construct from type and name
         self.address = address if address else f"{resource_type}.{name}"
+        # Lazily created by get_value; reset whenever values/name change
+        self._value_cache = None
 
     def get_value(self, path: str) -> Any:
         """
@@ -35,17 +77,56 @@ class Resource:
         Returns:
             The value at the path, or None if not found
         """
-        parts = path.split(".")
-        current = {"values": self.values, "name": self.name, "address": self.address}
-
-        for part in parts:
+        cache = self._value_cache
+        if cache is None:
+            cache = self._value_cache = {}
+        elif path in cache:
+            return cache[path]
+
+        parts = _split_path(path)
+        root = parts[0]
+
+        if root == "values":
+            current = self.values
+        elif root == "name":
+            current = self.name
+        elif root == "address":
+            current = self.address
+        else:
+            current = None
+
+        for part in parts[1:]:
             if isinstance(current, dict):
                 current = current.get(part)
             else:
-                return None
+                current = None
+                break
 
+        cache[path] = current
         return current
 
+    def get_value_lower(self, path: str) -> str:
+        """
+        Get a value as a lowercase string, for case-insensitive grouping.
+
+        Args:
+            path: Dot-separated path to the value
+
+        Returns:
+            The value at the path as a lowercase string, or 'unknown' if not found
+        """
+        # Shares the get_value cache; tuple keys never collide with path strings
+        key = (path, "lower")
+        cache = self._value_cache
+        if cache is not None and key in cache:
+            return cache[key]
+
+        value = self.get_value(path)
+        # Group values repeat across many resources; interning keeps one copy of each
+        lowered = sys.intern(str(value).lower()) if value is not None else "unknown"
+        self._value_cache[key] = lowered
+        return lowered
+
     def __repr__(self):
         return f"Resource({self.resource_type}, {self.name})"
 
@@ -60,32 +141,32 @@ def _merge_by_address(resources: List[Resource]) -> List[Resource]:
     """
     by_addr: Dict[str, Resource] = {}
 
-    def score(r: Resource) -> int:
-        # simple heuristic: more known fields => higher score
-        return len(r.values or {})
-
     for r in resources:
-        addr = r.address or f"{r.resource_type}.{r.name}"
-        r.address = addr
+        addr = r.address
+        if not addr:
+            addr = f"{r.resource_type}.{r.name}"
+            r.address = addr
 
-        if addr not in by_addr:
-            by_addr[addr] = r
+        existing = by_addr.setdefault(addr, r)
+        if existing is r:
             continue
 
-        existing = by_addr[addr]
-
         # Decide which one is "base" (keep name/type/address from it)
+        # simple heuristic: more known fields => higher score
         base, other = (existing, r)
-        if score(r) > score(existing):
+        if len(r.values or ()) > len(existing.values or ()):
             base, other = (r, existing)
 
-        # Merge values (base wins, but fill missing from other)
-        merged_values = dict(base.values or {})
-        for k, v in (other.values or {}).items():
-            if k not in merged_values or merged_values[k] in (None, "", [], {}):
-                merged_values[k] = v
-
-        base.values = merged_values
+        # Merge values in place (base wins, but fill missing from other)
+        o_values = other.values
+        if o_values:
+            b_values = base.values
+            if not b_values:
+                b_values = base.values = {}
+            for k, v in o_values.items():
+                cur = b_values.get(k)
+                if cur is None or cur == "" or cur == [] or cur == {}:
+                    b_values[k] = v
 
         # Keep the best display name (prefer longer / non-empty)
         if (not base.name) and other.name:
@@ -95,85 +176,149 @@ def _merge_by_address(resources: List[Resource]) -> List[Resource]:
             if base.name in ("default", ""):
                 base.name = other.name
 
-        by_addr[addr] = base
+        base._value_cache = None
+        if base is r:
+            by_addr[addr] = r
 
     return list(by_addr.values())
 
 
-def parse_terraform_plan(plan_path: str) -> List[Resource]:
+def _loads(data: bytes) -> Any:
+    """
+    Parse a JSON document, using orjson if it is installed.
+
+    orjson is only used when it gives the same result as json.loads. Documents
+    with integers wider than 64 bits, or with NaN/Infinity tokens (which
+    orjson rejects), are parsed by json.loads instead.
+
+    Args:
+        data: Raw JSON document
+
+    Returns:
+        The parsed document
+    """
+    if orjson is not None and _WIDE_INT_DIGITS not in data.translate(_DIGITS_TO_ZERO):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def stream_unavailable_reason() -> Optional[str]:
+    """
+    Explain why parse_terraform_plan cannot stream plans.
+
+    Returns:
+        A short reason, or None if stream=True will stream the plan
+    """
+    return _STREAM_UNAVAILABLE_REASON
+
+
+def parse_terraform_plan(plan_path: str, stream: bool = False) -> List[Resource]:
     """
     Parse a Terraform plan JSON file and extract resources.
 
+    By default the plan is loaded at once, using orjson if it is installed.
+    With stream=True and ijson installed with a compiled backend, the plan is
+    read with ijson instead: resource_changes are streamed one change at a
+    time, but planned_values.root_module is still built whole. This lowers
+    peak memory on large plans at the cost of a slower parse.
+
     Args:
         plan_path: Path to the Terraform plan JSON file
+        stream: Stream the plan with ijson when it is available; otherwise the
+            plan is loaded at once (see stream_unavailable_reason)
 
     Returns:
         List of Resource objects (deduped once by address)
     """
-    with open(plan_path, "r") as f:
-        plan_data = json.load(f)
-
     resources: List[Resource] = []
 
-    # 1) planned_values: best for structure
-    if "planned_values" in plan_data:
-        resources.extend(_extract_from_module(plan_data["planned_values"].get("root_module", {})))
+    if stream and ijson is not None:
+        with open(plan_path, "rb") as f:
+            # 1) planned_values: best for structure
+            for root_module in ijson.items(f, "planned_values.root_module", use_float=True):
+                _extract_from_module(root_module, resources)
 
-    # 2) resource_changes: often contains additional data, but may overlap with planned_values
-    if "resource_changes" in plan_data:
-        for change in plan_data["resource_changes"]:
-            resource_type = change.get("type", "")
-            name = change.get("name", "")
-            address = change.get("address", "")
+            # 2) resource_changes: streamed one change at a time
+            f.seek(0)
+            for change in ijson.items(f, "resource_changes.item", use_float=True):
+                resources.append(_resource_from_change(change))
+    else:
+        with open(plan_path, "rb") as f:
+            plan_data = _loads(f.read())
 
-            # If resource has an index, append it to name to make it unique for display/debugging
-            index = change.get("index")
-            if index is not None:
-                name = f"{name}[{index}]"
+        # 1) planned_values: best for structure
+        if "planned_values" in plan_data:
+            _extract_from_module(plan_data["planned_values"].get("root_module", {}), resources)
 
-            # Get values from after (planned state)
-            values: Dict[str, Any] = {}
-            after = change.get("change", {}).get("after")
-            if after is not None:
-                values = after or {}
-
-            # IMPORTANT: no dedup here (trust plan structure)
-            resources.append(Resource(resource_type, name, values, address))
+        # 2) resource_changes: often contains additional data, but may overlap with planned_values
+        for change in plan_data.get("resource_changes", []):
+            resources.append(_resource_from_change(change))
 
     # Option B: dedup once at the end by address (strict)
     return _merge_by_address(resources)
 
 
-def _extract_from_module(module: Dict[str, Any]) -> List[Resource]:
+def _resource_from_change(change: Dict[str, Any]) -> Resource:
     """
-    Extract resources from a module (recursive for nested modules).
+    Build a Resource from a single resource_changes entry.
 
     Args:
-        module: Module data from Terraform plan
+        change: Resource change data from Terraform plan
 
     Returns:
-        List of Resource objects
+        Resource object
     """
-    resources: List[Resource] = []
+    resource_type = change.get("type", "")
+    name = change.get("name", "")
+    address = change.get("address", "")
 
-    # Extract resources from current module
-    for resource_data in module.get("resources", []):
-        resource_type = resource_data.get("type", "")
-        name = resource_data.get("name", "")
-        address = resource_data.get("address", "")
+    # If resource has an index, append it to name to make it unique for display/debugging
+    index = change.get("index")
+    if index is not None:
+        name = f"{name}[{index}]"
 
-        # If resource has an index, append it to name to make it unique for display/debugging
-        index = resource_data.get("index")
-        if index is not None:
-            name = f"{name}[{index}]"
+    # Get values from after (planned state)
+    values = change.get("change", {}).get("after") or _EMPTY_VALUES
 
-        values = resource_data.get("values", {}) or {}
+    # IMPORTANT: no dedup here (trust plan structure)
+    return Resource(resource_type, name, values, address)
 
-        # IMPORTANT: no dedup here (trust plan structure)
-        resources.append(Resource(resource_type, name, values, address))
 
-    # Recursively extract from child modules
-    for child_module in module.get("child_modules", []):
-        resources.extend(_extract_from_module(child_module))
+def _extract_from_module(root_module: Dict[str, Any], out: List[Resource]) -> None:
+    """
+    Extract resources from a module and all of its nested child modules.
+
+    Modules are walked depth-first with an explicit stack, so deeply nested
+    module trees do not hit the recursion limit. Resources are appended
+    directly to the caller's list.
+
+    Args:
+        root_module: Root module data from Terraform plan
+        out: List to append the extracted Resource objects to
+    """
+    stack = [root_module]
+
+    while stack:
+        module = stack.pop()
+
+        # Extract resources from current module
+        for resource_data in module.get("resources", ()):
+            resource_type = resource_data.get("type", "")
+            name = resource_data.get("name", "")
+            address = resource_data.get("address", "")
+
+            # If resource has an index, append it to name to make it unique for display/debugging
+            index = resource_data.get("index")
+            if index is not None:
+                name = f"{name}[{index}]"
+
+            values = resource_data.get("values") or _EMPTY_VALUES
+
+            # IMPORTANT: no dedup here (trust plan structure)
+            out.append(Resource(resource_type, name, values, address))
 
-    return resources
+        # Push child modules in reverse so they are visited in plan order
+        stack.extend(reversed(module.get("child_modules", ())))
@@ -1,12 +1,17 @@
 """Diagram generator for Terraform resources."""
 
+import itertools
 import os
 import re
+import subprocess
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Set, TextIO
 
-from graphviz import Digraph
+import graphviz
 
 from terravisualizer.config_parser import get_resource_config
 from terravisualizer.plan_parser import Resource
@@ -16,6 +21,12 @@ GRAY_BASE_VALUE = 245  # Starting point (very light gray, #f5f5f5)
 GRAY_REDUCTION_PER_LEVEL = 10  # How much darker per nesting level
 GRAY_MIN_VALUE = 200  # Minimum gray value to prevent too dark colors (#c8c8c8)
 
+# Gray colors per nesting depth; the last entry is the first depth clamped to GRAY_MIN_VALUE
+_GRAY_COLORS = tuple(
+    '#{0:02x}{0:02x}{0:02x}'.format(max(GRAY_MIN_VALUE, GRAY_BASE_VALUE - depth * GRAY_REDUCTION_PER_LEVEL))
+    for depth in range((GRAY_BASE_VALUE - GRAY_MIN_VALUE) // GRAY_REDUCTION_PER_LEVEL + 2)
+)
+
 # Constants for node box sizing
 ICON_CELL_WIDTH = 64  # Width of icon cell in pixels
 MIN_TEXT_CELL_WIDTH = 200  # Minimum width of text cell for uniform box sizes
@@ -26,14 +37,172 @@ CHAR_WIDTH_SMALL_FONT = 7   # Estimated width per character for 11pt font
 
 # Constants for grouping
 RESOURCES_SUBGROUP_KEY = 'resources'  # Key for direct resource placement without sub-clustering
+# Prebuilt group key tuples, shared instead of being rebuilt per resource or group
+RESOURCES_GROUP_KEY = (RESOURCES_SUBGROUP_KEY,)
+UNGROUPED_GROUP_KEY = ('ungrouped',)
+
+# Patterns for display name templates like "${values.member}-${values.role}"
+_NAME_TEMPLATE_RE = re.compile(r'\$\{([^}]+)\}')
+_REPEATED_DASH_RE = re.compile(r'-{2,}')
+_EDGE_DASH_RE = re.compile(r'^-|-$')
 
 # Constants for layout
 OUTER_CLUSTER_STACK_WEIGHT = '5'  # Weight for invisible edges between outer clusters (vertical stacking)
+FAST_NSLIMIT = '5'  # Network simplex iteration cap (nslimit/nslimit1) in fast mode
 
 
-def extract_grouping_hierarchy(
+# DOT quoting rules (same as the graphviz package uses)
+_DOT_HTML_STRING_RE = re.compile(r'<.*>$', re.DOTALL)
+_DOT_ID_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?))$')
+_DOT_UNESCAPED_QUOTE_RE = re.compile(r'(?P<escaped_backslashes>(?:\\{2})*)\\?(?P<literal_quote>")')
+_DOT_KEYWORDS = frozenset(('node', 'edge', 'graph', 'digraph', 'subgraph', 'strict'))
+
+
+def _quote_dot(identifier: str) -> str:
+    """
+    Quote a DOT identifier or attribute value if needed.
+    
+    Args:
+        identifier: Node name, subgraph name or attribute value
+        
+    Returns:
+        The identifier as it should appear in DOT source
+    """
+    if _DOT_HTML_STRING_RE.match(identifier):
+        return identifier
+    if not _DOT_ID_RE.match(identifier) or identifier.lower() in _DOT_KEYWORDS:
+        escaped = _DOT_UNESCAPED_QUOTE_RE.sub(r'\g<escaped_backslashes>\\\g<literal_quote>', identifier)
+        return f'"{escaped}"'
+    return identifier
+
+
+def _dot_attr_list(attrs: Dict[str, str]) -> str:
+    """
+    Format attributes as a DOT attribute list, sorted by name.
+    
+    Args:
+        attrs: Attribute names and values
+        
+    Returns:
+        Space-separated name=value pairs
+    """
+    return ' '.join(f'{key}={_quote_dot(value)}' for key, value in sorted(attrs.items()))
+
+
+class _DotGraph:
+    """
+    Minimal DOT source writer for the subset of the graphviz.Digraph API used here.
+    
+    Statements are written straight to a text stream, with subgraphs writing
+    into the same stream at a deeper indentation, so the DOT source is never
+    held in memory as a whole.
+    """
+    
+    def __init__(self, out: TextIO, indent: str = '\t', ids: Optional[Iterator[int]] = None):
+        self.out = out
+        self.indent = indent
+        # Shared by the whole graph and all its subgraphs
+        self.ids = ids if ids is not None else itertools.count()
+    
+    def unique_name(self, prefix: str) -> str:
+        """Return a subgraph name that is unique within the whole graph."""
+        return f'{prefix}_{next(self.ids)}'
+    
+    def attr(self, kw: Optional[str] = None, **attrs: str) -> None:
+        """Add a graph attribute statement, or a node/edge default if kw is given."""
+        if kw is None:
+            self.out.write(f'{self.indent}{_dot_attr_list(attrs)}\n')
+        else:
+            self.out.write(f'{self.indent}{kw} [{_dot_attr_list(attrs)}]\n')
+    
+    def edge(self, tail_name: str, head_name: str, **attrs: str) -> None:
+        """Add an edge statement."""
+        attr_list = f' [{_dot_attr_list(attrs)}]' if attrs else ''
+        self.out.write(f'{self.indent}{_quote_dot(tail_name)} -> {_quote_dot(head_name)}{attr_list}\n')
+    
+    def html_nodes(self, nodes: List[Tuple[str, str]]) -> None:
+        """
+        Add node statements with HTML-like labels, in a single write.
+        
+        The names must be plain DOT IDs (like node_12) and the labels must be
+        <...> HTML-like labels, so neither needs to go through _quote_dot.
+        """
+        indent = self.indent
+        self.out.write(''.join([f'{indent}{name} [label={label}]\n' for name, label in nodes]))
+    
+    def invisible_chain(self, node_names: List[str], weight: str) -> None:
+        """Add invisible edges linking each node to the next, in a single write."""
+        indent = self.indent
+        names = [_quote_dot(node_name) for node_name in node_names]
+        attr_list = f'[style=invis weight={_quote_dot(weight)}]'
+        self.out.write(''.join([
+            f'{indent}{tail} -> {head} {attr_list}\n' for tail, head in zip(names, names[1:])
+        ]))
+    
+    def same_rank(self, name: str, node_names: List[str]) -> None:
+        """Add a subgraph with rank=same holding the given nodes, in a single write."""
+        inner = self.indent + '\t'
+        self.out.write(f'{self.indent}subgraph {_quote_dot(name)} {{\n'
+                       f'{inner}rank=same\n'
+                       + ''.join([f'{inner}{_quote_dot(node_name)}\n' for node_name in node_names])
+                       + f'{self.indent}}}\n')
+    
+    @contextmanager
+    def subgraph(self, name: str) -> Iterator['_DotGraph']:
+        """Open a subgraph; statements added to the yielded graph go inside it."""
+        self.out.write(f'{self.indent}subgraph {_quote_dot(name)} {{\n')
+        yield _DotGraph(self.out, self.indent + '\t', self.ids)
+        self.out.write(f'{self.indent}}}\n')
+
+
+def _render_dot_file(dot_path: str, output_base: str, output_format: str,
+                     engine: str = 'dot') -> str:
+    """
+    Render a DOT source file with a Graphviz layout engine.
+    
+    Args:
+        dot_path: Path to the DOT source file
+        output_base: Output path without extension
+        output_format: Output format (png, svg, pdf, etc.)
+        engine: Graphviz layout engine executable (dot, fdp, sfdp, neato)
+        
+    Returns:
+        Path to the rendered file
+    """
+    output_file = f'{output_base}.{output_format}'
+    try:
+        subprocess.run([engine, f'-T{output_format}', dot_path, '-o', output_file], check=True)
+    except FileNotFoundError:
+        # Engine not on PATH; let the graphviz package locate the executable
+        # (or raise its usual ExecutableNotFound error)
+        return graphviz.render(engine, output_format, dot_path, outfile=output_file)
+    return output_file
+
+
+def get_resource_configs_by_type(
     resources: List[Resource],
     config: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up the configuration of each resource type present in the resources once.
+    
+    Args:
+        resources: List of resources
+        config: Configuration dictionary
+        
+    Returns:
+        Dictionary mapping resource types to their configuration
+    """
+    return {
+        resource_type: get_resource_config(config, resource_type)
+        for resource_type in {resource.resource_type for resource in resources}
+    }
+
+
+def extract_grouping_hierarchy(
+    resources: List[Resource],
+    config: Dict[str, Any],
+    resource_configs: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Dict[str, List[str]]:
     """
     Extract the grouping hierarchy from all resource configurations.
@@ -41,14 +210,19 @@ def extract_grouping_hierarchy(
     Args:
         resources: List of resources
         config: Configuration dictionary
+        resource_configs: Optional precomputed per-type configuration
+            (see get_resource_configs_by_type)
         
     Returns:
         Dictionary mapping resource types to their grouping fields
     """
+    if resource_configs is None:
+        resource_configs = get_resource_configs_by_type(resources, config)
+    
     hierarchy = {}
     
     for resource in resources:
-        resource_config = get_resource_config(config, resource.resource_type)
+        resource_config = resource_configs[resource.resource_type]
         if resource_config and 'grouped_by' in resource_config:
             grouped_by = resource_config['grouped_by']
             if grouped_by and resource.resource_type not in hierarchy:
@@ -69,20 +243,14 @@ def build_group_key(resource: Resource, grouping_fields: List[str]) -> Tuple[str
     Returns:
         Tuple of group values (normalized to lowercase)
     """
-    key_parts = []
-    for field in grouping_fields:
-        value = resource.get_value(field)
-        if value is not None:
-            # Normalize to lowercase for case-insensitive grouping
-            key_parts.append(str(value).lower())
-        else:
-            key_parts.append('unknown')
-    return tuple(key_parts)
+    # Normalize to lowercase for case-insensitive grouping
+    return tuple(resource.get_value_lower(field) for field in grouping_fields)
 
 
 def group_resources_hierarchically(
     resources: List[Resource], 
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    resource_configs: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Tuple[Dict[Tuple[str, ...], Any], Dict[str, List[Resource]]]:
     """
     Group resources hierarchically based on configuration.
@@ -100,6 +268,8 @@ def group_resources_hierarchically(
     Args:
         resources: List of resources to group
         config: Configuration dictionary
+        resource_configs: Optional precomputed per-type configuration
+            (see get_resource_configs_by_type)
         
     Returns:
         Tuple of:
@@ -107,17 +277,28 @@ def group_resources_hierarchically(
           Can be: group_key -> nested_dict OR group_key -> [resources]
         - Dictionary mapping parent resource keys to their children
     """
-    # Extract grouping hierarchy
-    hierarchy = extract_grouping_hierarchy(resources, config)
+    if resource_configs is None:
+        resource_configs = get_resource_configs_by_type(resources, config)
+    
+    # Resolve the 'id' and 'group_id' fields once per resource type
+    id_field_by_type = {
+        resource_type: resource_config['id']
+        for resource_type, resource_config in resource_configs.items()
+        if resource_config and 'id' in resource_config
+    }
+    group_id_field_by_type = {
+        resource_type: resource_config['group_id']
+        for resource_type, resource_config in resource_configs.items()
+        if resource_config and 'group_id' in resource_config
+    }
     
     # First pass: identify resources that can be parents (have 'id' defined)
-    # Use resource.address as the unique key for script perspective
-    parent_resources = {}  # Maps resource.address -> (id_value, resource)
-    parent_map = {}  # Maps parent resource key -> resource object
+    # Parents are indexed by their lowercased id value so children can be matched
+    # with a single dict lookup; each list keeps the resources in plan order
+    parents_by_id: Dict[str, List[Resource]] = {}
     for resource in resources:
-        resource_config = get_resource_config(config, resource.resource_type)
-        if resource_config and 'id' in resource_config:
-            id_field = resource_config['id']
+        id_field = id_field_by_type.get(resource.resource_type)
+        if id_field is not None:
             id_value = resource.get_value(id_field)
             
             # If id_value is None or empty, use resource address as fallback
@@ -127,118 +308,102 @@ def group_resources_hierarchically(
                 id_value = resource.address
             
             if id_value:
-                # Use resource.address as the unique key (entire path)
-                # Store both the id_value (for HCL matching) and the resource
-                parent_resources[resource.address] = (str(id_value), resource)
-                parent_map[resource.address] = resource
+                parents_by_id.setdefault(str(id_value).lower(), []).append(resource)
     
     # Second pass: identify parent-child relationships
-    resource_to_parent = {}  # Maps child resource -> parent resource
+    # Resources that were matched to a parent (Resource hashes by identity)
+    child_resources: Set[Resource] = set()
     parent_to_children = {}  # Maps parent resource key -> list of children
     
     for resource in resources:
-        resource_config = get_resource_config(config, resource.resource_type)
+        resource_type = resource.resource_type
         
         # Check if this resource has a parent (group_id)
-        if resource_config and 'group_id' in resource_config:
-            group_id_field = resource_config['group_id']
-            
+        group_id_field = group_id_field_by_type.get(resource_type)
+        if group_id_field is not None:
             # Expand template if present, otherwise get value directly
             parent_id = resource.get_value(group_id_field)
             
             if parent_id:
-                # Find parent resource - do case-sensitive exact matching
-                parent_id_str = str(parent_id)
+                # Find parent resource - ids are matched case-insensitively
+                # (an exact match is also a case-insensitive one)
                 matched_parent = None
-                
-                # Iterate through parent_resources using new structure: address -> (id_value, resource)
-                for parent_address, (parent_id_val, potential_parent) in parent_resources.items():
+                for potential_parent in parents_by_id.get(str(parent_id).lower(), ()):
                     # Skip if the potential parent is of the same type as the child
                     # (resources shouldn't be nested inside resources of the same type)
-                    if potential_parent.resource_type == resource.resource_type:
-                        continue
-                    
-                    # Try exact match first (case-sensitive)
-                    if parent_id_str == parent_id_val:
-                        matched_parent = potential_parent
-                        break
-                    
-                    # For google_service_account, try matching with constructed email
-                    if potential_parent.resource_type == 'google_service_account' and not matched_parent:
-                        # Check if child's service_account_id matches constructed format
-                        if '@' in parent_id_str and '@' in parent_id_val:
-                            # Both have email format, try matching email part
-                            child_email = parent_id_str
-                            parent_email = parent_id_val
-                            if child_email.lower() == parent_email.lower():
-                                matched_parent = potential_parent
-                                break
-                    # Fallback to case-insensitive match
-                    if parent_id_str.lower() == parent_id_val.lower():
+                    if potential_parent.resource_type != resource_type:
                         matched_parent = potential_parent
                         break
                 
                 if matched_parent:
-                    resource_to_parent[resource] = matched_parent
+                    child_resources.add(resource)
                     # Use resource.address as the key for parent_to_children map
                     parent_key = matched_parent.address
-                    if parent_key not in parent_to_children:
-                        parent_to_children[parent_key] = []
-                    parent_to_children[parent_key].append(resource)
+                    parent_to_children.setdefault(parent_key, []).append(resource)
     
     # Third pass: build groups, excluding children (they'll be rendered inside parents)
     # Support unlimited nesting levels using recursive structure
     nested_groups = {}  # Maps group_key -> nested dict or list of resources
     
+    # Get the grouping fields once per resource type
+    grouped_by_per_type = {
+        resource_type: (resource_config.get('grouped_by') if resource_config else None) or []
+        for resource_type, resource_config in resource_configs.items()
+    }
+    
     for resource in resources:
         # Skip resources that are children (they'll be rendered with their parent)
-        if resource in resource_to_parent:
+        if resource in child_resources:
             continue
-            
-        resource_config = get_resource_config(config, resource.resource_type)
         
-        # Get the grouping fields for this resource
-        if not resource_config or 'grouped_by' not in resource_config:
-            grouped_by = []
-        else:
-            grouped_by = resource_config['grouped_by']
-            if not grouped_by:
-                grouped_by = []
+        grouped_by = grouped_by_per_type[resource.resource_type]
         
         # Build the full hierarchy path for this resource
         if not grouped_by:
             # No grouping - use 'ungrouped' as the key
-            hierarchy_path = [('ungrouped',)]
+            hierarchy_path = [UNGROUPED_GROUP_KEY]
         else:
             # Build path from all grouping fields
-            hierarchy_path = []
-            for field in grouped_by:
-                value = resource.get_value(field)
-                normalized_value = str(value).lower() if value is not None else 'unknown'
-                hierarchy_path.append((normalized_value,))
+            get_value_lower = resource.get_value_lower
+            hierarchy_path = [(get_value_lower(field),) for field in grouped_by]
         
-        # Navigate/create the nested structure
+        # Navigate/create the nested structure (intermediate levels are dicts)
         current_level = nested_groups
-        for i, path_key in enumerate(hierarchy_path):
-            is_last = (i == len(hierarchy_path) - 1)
-            
-            if is_last:
-                # Last level - store resources in a list
-                if path_key not in current_level:
-                    current_level[path_key] = {(RESOURCES_SUBGROUP_KEY,): []}
-                # Ensure the structure exists
-                if (RESOURCES_SUBGROUP_KEY,) not in current_level[path_key]:
-                    current_level[path_key][(RESOURCES_SUBGROUP_KEY,)] = []
-                current_level[path_key][(RESOURCES_SUBGROUP_KEY,)].append(resource)
-            else:
-                # Intermediate level - create nested dict
-                if path_key not in current_level:
-                    current_level[path_key] = {}
-                current_level = current_level[path_key]
+        for path_key in hierarchy_path[:-1]:
+            current_level = current_level.setdefault(path_key, {})
+        
+        # Last level - store resources in a list
+        leaf = current_level.setdefault(hierarchy_path[-1], {})
+        leaf.setdefault(RESOURCES_GROUP_KEY, []).append(resource)
     
     return nested_groups, parent_to_children
 
 
+@lru_cache(maxsize=256)
+def _compile_name_template(name_template: str) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Compile a display name template into a format string and its field paths.
+    
+    "${values.member}-${values.role}" becomes ("{0}-{1}", ("values.member", "values.role")),
+    so each resource is formatted in a single pass instead of one replace per field.
+    Positional fields are used because dotted paths are not valid format field names.
+    
+    Args:
+        name_template: Template with ${...} placeholders
+        
+    Returns:
+        Tuple of (format string, field paths in placeholder order)
+    """
+    # split() alternates literal text and captured field paths
+    parts = _NAME_TEMPLATE_RE.split(name_template)
+    literals = [part.replace('{', '{{').replace('}', '}}') for part in parts[0::2]]
+    field_paths = tuple(field.strip() for field in parts[1::2])
+    format_string = literals[0] + ''.join(
+        f'{{{index}}}{literal}' for index, literal in enumerate(literals[1:])
+    )
+    return format_string, field_paths
+
+
 def get_display_name(resource: Resource, resource_config: Dict[str, Any]) -> str:
     """
     Get the display name for a resource based on configuration.
@@ -255,22 +420,15 @@ def get_display_name(resource: Resource, resource_config: Dict[str, Any]) -> str
     
     # Check if it's a template with ${} syntax
     if '${' in name_template and '}' in name_template:
-        # Extract all ${...} patterns
-        pattern = r'\$\{([^}]+)\}'
-        matches = re.findall(pattern, name_template)
-
-        result = name_template
-        for match in matches:
-            field_path = match.strip()
-            value = resource.get_value(field_path)
-            
-            # Replace ${field} with the actual value (or empty string if not found)
-            replacement = str(value) if value is not None else ''
-            result = result.replace(f'${{{match}}}', replacement)
+        format_string, field_paths = _compile_name_template(name_template)
+        
+        # Replace ${field} with the actual value (or empty string if not found)
+        values = [resource.get_value(field_path) for field_path in field_paths]
+        result = format_string.format(*['' if value is None else value for value in values])
         
         # Clean up any double separators (e.g., "--" or " - ")
-        result = re.sub(r'-{2,}', '-', result)
-        result = re.sub(r'^-|-$', '', result)  # Remove leading/trailing dashes
+        result = _REPEATED_DASH_RE.sub('-', result)
+        result = _EDGE_DASH_RE.sub('', result)  # Remove leading/trailing dashes
 
         return result.strip() if result.strip() else resource.name
     else:
@@ -284,9 +442,31 @@ def get_display_name(resource: Resource, resource_config: Dict[str, Any]) -> str
         return resource.name
 
 
+def get_display_names(
+    resources: List[Resource],
+    resource_configs: Dict[str, Dict[str, Any]]
+) -> Dict[Resource, str]:
+    """
+    Get the display name of every resource once, for reuse by all passes.
+    
+    Args:
+        resources: List of resources
+        resource_configs: Per-type configuration (see get_resource_configs_by_type)
+        
+    Returns:
+        Dictionary mapping each resource to its display name
+    """
+    return {
+        resource: get_display_name(resource, resource_configs[resource.resource_type])
+        for resource in resources
+    }
+
+
 def calculate_max_widths_per_type(
     resources: List[Resource],
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    resource_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+    display_names: Optional[Dict[Resource, str]] = None
 ) -> Dict[str, int]:
     """
     Calculate the maximum text width needed for each resource type.
@@ -298,39 +478,39 @@ def calculate_max_widths_per_type(
     Args:
         resources: List of all resources
         config: Configuration dictionary
+        resource_configs: Optional precomputed per-type configuration
+            (see get_resource_configs_by_type)
+        display_names: Optional precomputed display names (see get_display_names)
         
     Returns:
         Dictionary mapping resource_type to estimated max width in pixels
     """
-    type_widths = {}
-    
+    if display_names is None:
+        if resource_configs is None:
+            resource_configs = get_resource_configs_by_type(resources, config)
+        display_names = get_display_names(resources, resource_configs)
+    
+    # Track the longest display name per type; the type name is the same for all
+    # resources of a type, so its width only needs to be added once at the end
+    max_name_lengths: Dict[str, int] = {}
     for resource in resources:
-        resource_config = get_resource_config(config, resource.resource_type)
-        display_name = get_display_name(resource, resource_config)
-        
-        # Estimate width based on character count and font sizes
-        display_name_width = len(display_name) * CHAR_WIDTH_LARGE_FONT
-        resource_type_width = len(resource.resource_type) * CHAR_WIDTH_SMALL_FONT
-        
-        # Take the max of the two text elements
-        estimated_width = max(display_name_width, resource_type_width)
-        
-        # Track maximum for this resource type
-        if resource.resource_type not in type_widths:
-            type_widths[resource.resource_type] = estimated_width
-        else:
-            type_widths[resource.resource_type] = max(
-                type_widths[resource.resource_type],
-                estimated_width
-            )
-    
-    # Ensure minimum width and add padding
-    for resource_type in type_widths:
-        type_widths[resource_type] = max(MIN_TEXT_CELL_WIDTH, type_widths[resource_type] + 20)
-    
-    return type_widths
+        resource_type = resource.resource_type
+        name_length = len(display_names[resource])
+        if name_length >= max_name_lengths.get(resource_type, 0):
+            max_name_lengths[resource_type] = name_length
+    
+    # Estimate width based on character count and font sizes, taking the max of
+    # the two text elements, then ensure minimum width and add padding
+    return {
+        resource_type: max(
+            MIN_TEXT_CELL_WIDTH,
+            max(name_length * CHAR_WIDTH_LARGE_FONT,
+                len(resource_type) * CHAR_WIDTH_SMALL_FONT) + 20
+        )
+        for resource_type, name_length in max_name_lengths.items()
+    }
 
-def _layout_group_anchors(outer_cluster: Digraph, anchor_node_ids: List[str]) -> None:
+def _layout_group_anchors(outer_cluster: _DotGraph, anchor_node_ids: List[str]) -> None:
     """
     Layout anchor nodes for sub-clusters:
     - For small counts: keep them on one row (rank=same)
@@ -341,13 +521,9 @@ def _layout_group_anchors(outer_cluster: Digraph, anchor_node_ids: List[str]) ->
 
     # Small: one row looks nice
     if len(anchor_node_ids) <= 3:
-        with outer_cluster.subgraph(name=f'rank_groups_{abs(hash(tuple(anchor_node_ids)))}') as rg:
-            rg.attr(rank='same')
-            for nid in anchor_node_ids:
-                rg.node(nid)
+        outer_cluster.same_rank(outer_cluster.unique_name('rank_groups'), anchor_node_ids)
 
-        for i in range(len(anchor_node_ids) - 1):
-            outer_cluster.edge(anchor_node_ids[i], anchor_node_ids[i + 1], style='invis', weight='15')
+        outer_cluster.invisible_chain(anchor_node_ids, '15')
         return
 
     # Bigger: wrap into grid
@@ -357,10 +533,11 @@ def _layout_group_anchors(outer_cluster: Digraph, anchor_node_ids: List[str]) ->
 def _render_nested_groups(
     parent_graph,
     nested_dict: Dict[Tuple[str, ...], Any],
-    config: Dict[str, Any],
+    resource_configs: Dict[str, Dict[str, Any]],
     node_ids: Dict[str, str],
     node_counter: int,
-    max_widths_per_type: Dict[str, int],
+    node_label_parts: Dict[str, Tuple[str, str]],
+    display_names: Dict[Resource, str],
     parent_to_children: Dict[str, List[Resource]],
     depth: int = 1,
     path_stack: List[str] = None,
@@ -372,10 +549,11 @@ def _render_nested_groups(
     Args:
         parent_graph: The parent graph/cluster to render into
         nested_dict: Dictionary that may contain nested dicts or resources
-        config: Configuration dictionary
+        resource_configs: Per-type configuration (see get_resource_configs_by_type)
         node_ids: Dictionary to track node IDs
         node_counter: Current node counter
-        max_widths_per_type: Dictionary of resource_type -> max width
+        node_label_parts: Dictionary of resource_type -> (prefix, suffix) node label parts
+        display_names: Dictionary of resource -> display name
         parent_to_children: Dictionary mapping parent resource keys to their children
         depth: Current nesting depth for gray color
         path_stack: Stack of group names for label formatting
@@ -391,40 +569,39 @@ def _render_nested_groups(
     # Track grouping field names for each anchor to determine layout
     anchor_grouping_fields: List[Optional[str]] = []
     
-    # Sort groups: ungrouped last (far right), then alphabetically
-    def sort_key(item):
-        key, _ = item
-        if key == ('ungrouped',):
-            return (1, 'zzz_ungrouped')  # Place ungrouped at the very end
-        return (0, str(key))  # Others come first, alphabetically sorted
+    # Sort groups: ungrouped last (far right), then alphabetically.
+    # Group keys are tuples of strings, so they compare directly without
+    # building a string representation per key.
+    sorted_keys = sorted(nested_dict, key=lambda key: (key == UNGROUPED_GROUP_KEY, key))
     
-    sorted_items = sorted(nested_dict.items(), key=sort_key)
-    
-    for group_key, group_content in sorted_items:
+    for group_key in sorted_keys:
+        group_content = nested_dict[group_key]
+        
         # Check if this level has any content (resources or nested groups)
         if not isinstance(group_content, dict):
             continue
         
+        # Split the direct resources from the nested groups once
+        resources_list = group_content.get(RESOURCES_GROUP_KEY)
+        has_resources = resources_list is not None
+        has_nested_groups = len(group_content) > (1 if has_resources else 0)
+        
         # Extract grouping field names for this group
         group_grouping_fields = None
-        if (RESOURCES_SUBGROUP_KEY,) in group_content:
-            resources_list = group_content[(RESOURCES_SUBGROUP_KEY,)]
+        if has_resources:
             if resources_list:
                 # Get grouping fields from first resource in this group
                 first_resource = resources_list[0]
-                resource_config = get_resource_config(config, first_resource.resource_type)
+                resource_config = resource_configs[first_resource.resource_type]
                 if resource_config and 'grouped_by' in resource_config:
                     grouped_by = resource_config['grouped_by']
                     if grouped_by:
                         # Get the field name at the next depth level (safely handles out of bounds)
                         level_idx = depth - 1
                         group_grouping_fields = grouped_by[level_idx] if level_idx < len(grouped_by) else None
-            
-        has_resources = (RESOURCES_SUBGROUP_KEY,) in group_content
-        has_nested_groups = any(k != (RESOURCES_SUBGROUP_KEY,) for k in group_content.keys())
         
         # Create a cluster for this group
-        cluster_name = f'cluster_{abs(hash(tuple(path_stack + [group_key[0]])))}'
+        cluster_name = parent_graph.unique_name('cluster')
         
         with parent_graph.subgraph(name=cluster_name) as cluster:
             # ----------------------------
@@ -464,12 +641,15 @@ def _render_nested_groups(
             # (We also keep the returned anchors so we can align them later.)
             nested_grouping_fields = None  # kept for compatibility with your current signature
             if has_nested_groups:
-                nested_group_dict = {k: v for k, v in group_content.items() if k != (RESOURCES_SUBGROUP_KEY,)}
+                if has_resources:
+                    nested_group_dict = {k: v for k, v in group_content.items() if k != RESOURCES_GROUP_KEY}
+                else:
+                    nested_group_dict = group_content
 
                 new_path_stack = path_stack + [group_key[0]]
                 node_counter, nested_anchors, nested_grouping_fields = _render_nested_groups(
-                    cluster, nested_group_dict, config, node_ids, node_counter,
-                    max_widths_per_type, parent_to_children, depth + 1, new_path_stack,
+                    cluster, nested_group_dict, resource_configs, node_ids, node_counter,
+                    node_label_parts, display_names, parent_to_children, depth + 1, new_path_stack,
                     group_grouping_fields
                 )
 
@@ -480,29 +660,32 @@ def _render_nested_groups(
             # 2) Render direct resources SECOND (so they go below groups)
             # ------------------------------------------------------------
             if has_resources:
-                resources_list = group_content[(RESOURCES_SUBGROUP_KEY,)]
+                # Regular nodes are written in batches, flushed before each parent cluster
+                pending_nodes: List[Tuple[str, str]] = []
 
                 for resource in resources_list:
                     parent_key = resource.address
 
                     # If this resource has children: create parent cluster and render children
                     if parent_key in parent_to_children:
-                        parent_cluster_name = f'cluster_parent_{abs(hash(parent_key))}'
+                        if pending_nodes:
+                            cluster.html_nodes(pending_nodes)
+                            pending_nodes = []
+
+                        parent_cluster_name = cluster.unique_name('cluster_parent')
 
                         with cluster.subgraph(name=parent_cluster_name) as parent_cluster:
-                            resource_config = get_resource_config(config, resource.resource_type)
-                            display_name = get_display_name(resource, resource_config)
-                            _apply_parent_cluster_style(parent_cluster, display_name, depth=depth + 1)
+                            _apply_parent_cluster_style(parent_cluster, display_names[resource], depth=depth + 1)
 
                             children = parent_to_children[parent_key]
-                            grouped_children = _group_children_by_config(children, config)
+                            grouped_children = _group_children_by_config(children, resource_configs)
 
                             child_node_ids: List[str] = []
                             child_node_types: Dict[str, str] = {}
                             node_counter = _render_grouped_children(
-                                parent_cluster, grouped_children, config,
+                                parent_cluster, grouped_children, display_names,
                                 node_ids, child_node_ids, node_counter,
-                                max_widths_per_type, depth=depth + 2,
+                                node_label_parts, depth=depth + 2,
                                 node_types=child_node_types
                             )
 
@@ -523,17 +706,15 @@ def _render_nested_groups(
                         local_node_ids.append(node_id)
                         local_node_types[node_id] = resource.resource_type
 
-                        resource_config = get_resource_config(config, resource.resource_type)
-                        display_name = get_display_name(resource, resource_config)
-                        icon_path = resource_config.get('diagram_image', '')
-
-                        text_width = max_widths_per_type.get(resource.resource_type)
-                        node_label = _create_node_label(resource.resource_type, display_name, icon_path, text_width)
-                        cluster.node(node_id, label=node_label)
+                        label_prefix, label_suffix = node_label_parts[resource.resource_type]
+                        pending_nodes.append((node_id, f'{label_prefix}{_escape_html(display_names[resource])}{label_suffix}'))
 
                         if direct_resource_anchor is None:
                             direct_resource_anchor = node_id
 
+                if pending_nodes:
+                    cluster.html_nodes(pending_nodes)
+
                 # Layout direct resources by type (same-type vertical, different types horizontal)
                 if local_node_ids:
                     _layout_nodes_by_type(cluster, local_node_ids, local_node_types)
@@ -550,8 +731,7 @@ def _render_nested_groups(
                     _layout_anchors_by_fieldname(cluster, anchors_with_field)
                 else:
                     # L1 oder keine Feldnamen-Info: einfach vertikal stapeln
-                    for i in range(len(nested_anchor_nodes) - 1):
-                        cluster.edge(nested_anchor_nodes[i], nested_anchor_nodes[i + 1], style='invis', weight='10')
+                    cluster.invisible_chain(nested_anchor_nodes, '10')
 
             # ------------------------------------------------------------
             # 4) Force: direct resources BELOW the groups
@@ -578,46 +758,45 @@ def _render_nested_groups(
     return node_counter, anchor_nodes, anchor_grouping_fields
 
 
-def generate_diagram(
-    resources: List[Resource],
-    config: Dict[str, Any],
-    output_path: str,
-    output_format: str = 'png',
-    title: Optional[str] = None
-) -> str:
+def _write_diagram_source(
+    out: TextIO,
+    grouped: Dict[Tuple[str, ...], Any],
+    resource_configs: Dict[str, Dict[str, Any]],
+    node_label_parts: Dict[str, Tuple[str, str]],
+    display_names: Dict[Resource, str],
+    parent_to_children: Dict[str, List[Resource]],
+    title: str,
+    timestamp: str,
+    fast: bool = False
+) -> None:
     """
-    Generate a visual diagram of resources.
+    Write the DOT source of the diagram.
     
     Args:
-        resources: List of resources to visualize
-        config: Configuration dictionary
-        output_path: Path for the output file
-        output_format: Output format (png, svg, pdf)
-        title: Optional title for the diagram. If not provided, generates a run number based on timestamp.
-        
-    Returns:
-        Path to the generated diagram
+        out: Text stream to write the DOT source to
+        grouped: Nested groups from group_resources_hierarchically
+        resource_configs: Per-type configuration (see get_resource_configs_by_type)
+        node_label_parts: Dictionary of resource_type -> (prefix, suffix) node label parts
+        display_names: Dictionary of resource -> display name
+        parent_to_children: Dictionary mapping parent resource keys to their children
+        title: Diagram title
+        timestamp: Timestamp shown next to the title
+        fast: Use straight edge routing instead of orthogonal routing, and cap
+            the network simplex iterations used for ranking and positioning
     """
-    # Calculate max widths per resource type for uniform box sizes
-    max_widths_per_type = calculate_max_widths_per_type(resources, config)
-    
-    # Group resources hierarchically
-    grouped, parent_to_children = group_resources_hierarchically(resources, config)
-    
-    # Generate title and timestamp (use single datetime call)
-    now = datetime.now()
-    timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
-    if not title:
-        # Generate a run number based on timestamp (unique identifier)
-        run_number = now.strftime('%Y%m%d%H%M%S')
-        title = f"Run #{run_number}"
-    
     # Create directed graph with modern layout settings
-    dot = Digraph(comment='Terraform Resources', engine='dot')
+    out.write('// Terraform Resources\ndigraph {\n')
+    dot = _DotGraph(out)
     
     # Layout - Top to Bottom with improved spacing
     dot.attr(rankdir='TB')  # Top to Bottom for better visual hierarchy
-    dot.attr(splines='ortho')  # Orthogonal splines for cleaner look
+    # Orthogonal splines for cleaner look; routing them dominates layout time on
+    # large graphs, so fast mode uses straight lines instead
+    dot.attr(splines='line' if fast else 'ortho')
+    if fast:
+        # Network simplex can take minutes to converge on large plans with many
+        # rank=same constraints; a small iteration cap keeps it to seconds
+        dot.attr(nslimit=FAST_NSLIMIT, nslimit1=FAST_NSLIMIT)
     dot.attr(compound='true')
     dot.attr(concentrate='false')
     dot.attr(newrank='true')
@@ -666,28 +845,101 @@ def generate_diagram(
         
         # Use the new recursive rendering function to handle unlimited nesting
         node_counter, outer_cluster_anchor_nodes, outer_grouping_fields = _render_nested_groups(
-            container, grouped, config, node_ids, node_counter,
-            max_widths_per_type, parent_to_children, depth=1
+            container, grouped, resource_configs, node_ids, node_counter,
+            node_label_parts, display_names, parent_to_children, depth=1
         )
         
         # Layout outer clusters (L1) horizontally side by side
         if len(outer_cluster_anchor_nodes) > 1:
             # Place all L1 clusters on the same rank (horizontal)
-            with container.subgraph(name='rank_l1_clusters') as rg:
-                rg.attr(rank='same')
-                for anchor_id in outer_cluster_anchor_nodes:
-                    rg.node(anchor_id)
+            container.same_rank('rank_l1_clusters', outer_cluster_anchor_nodes)
             
             # Add invisible edges to maintain horizontal order
-            for i in range(len(outer_cluster_anchor_nodes) - 1):
-                container.edge(outer_cluster_anchor_nodes[i], outer_cluster_anchor_nodes[i + 1],
-                             style='invis', weight='15')
+            container.invisible_chain(outer_cluster_anchor_nodes, '15')
+    
+    out.write('}\n')
+
+
+def generate_diagram(
+    resources: List[Resource],
+    config: Dict[str, Any],
+    output_path: str,
+    output_format: str = 'png',
+    title: Optional[str] = None,
+    engine: str = 'dot',
+    fast: bool = False
+) -> str:
+    """
+    Generate a visual diagram of resources.
+    
+    Args:
+        resources: List of resources to visualize
+        config: Configuration dictionary
+        output_path: Path for the output file
+        output_format: Output format (png, svg, pdf)
+        title: Optional title for the diagram. If not provided, generates a run number based on timestamp.
+        engine: Graphviz layout engine. 'dot' gives the intended layered layout;
+            'sfdp' lays out very large plans much faster, but ignores the rank
+            constraints used to align resources inside groups.
+        fast: Route edges as straight lines instead of orthogonal splines and
+            cap the network simplex iterations, which lays out large plans much
+            faster at the cost of less tidy edges and node placement.
+        
+    Returns:
+        Path to the generated diagram
+    """
+    # Look up each resource type's configuration once for all passes below
+    resource_configs = get_resource_configs_by_type(resources, config)
+    
+    # Resolve display name templates once for sizing and rendering
+    display_names = get_display_names(resources, resource_configs)
+    
+    # Calculate max widths per resource type for uniform box sizes
+    max_widths_per_type = calculate_max_widths_per_type(resources, config, resource_configs, display_names)
+    
+    # Resolve each distinct icon once; types often share an icon
+    icon_abs_paths: Dict[str, Optional[str]] = {}
+    for resource_config in resource_configs.values():
+        icon_path = resource_config.get('diagram_image', '')
+        if icon_path and icon_path not in icon_abs_paths:
+            icon_abs_paths[icon_path] = _resolve_icon_path(icon_path)
+    
+    # Pre-render the per-type parts of node labels (escaped type, icon cell, width)
+    node_label_parts = {
+        resource_type: _create_node_label_parts(
+            resource_type,
+            icon_abs_paths.get(resource_config.get('diagram_image', '')),
+            max_widths_per_type.get(resource_type)
+        )
+        for resource_type, resource_config in resource_configs.items()
+    }
+    
+    # Group resources hierarchically
+    grouped, parent_to_children = group_resources_hierarchically(resources, config, resource_configs)
+    
+    # Generate title and timestamp (use single datetime call and format)
+    run_number = datetime.now().strftime('%Y%m%d%H%M%S')
+    timestamp = (f'{run_number[0:4]}-{run_number[4:6]}-{run_number[6:8]} '
+                 f'{run_number[8:10]}:{run_number[10:12]}:{run_number[12:14]}')
+    if not title:
+        # Use the run number based on timestamp as a unique identifier
+        title = f"Run #{run_number}"
     
     # Remove extension from output_path if present
     output_base = str(Path(output_path).with_suffix(''))
     
-    # Render the diagram
-    dot.render(output_base, format=output_format, cleanup=True)
+    # Stream the DOT source to a temporary file instead of holding it in memory
+    dot_file = tempfile.NamedTemporaryFile('w', buffering=1 << 20, suffix='.gv',
+                                           encoding='utf-8', delete=False)
+    try:
+        with dot_file:
+            _write_diagram_source(dot_file, grouped, resource_configs, node_label_parts,
+                                  display_names, parent_to_children, title, timestamp, fast)
+        
+        # Render the diagram
+        _render_dot_file(dot_file.name, output_base, output_format, engine)
+    finally:
+        os.remove(dot_file.name)
     
     return f'{output_base}.{output_format}'
 
@@ -703,22 +955,20 @@ def _get_gray_color(depth: int) -> str:
     Returns:
         Hex color string
     """
-    # Use module constants for gray color calculation
-    value = max(GRAY_MIN_VALUE, GRAY_BASE_VALUE - (depth * GRAY_REDUCTION_PER_LEVEL))
-    hex_value = format(value, '02x')
-    return f'#{hex_value}{hex_value}{hex_value}'
+    # Deeper levels all share the minimum gray, i.e. the last table entry
+    return _GRAY_COLORS[min(depth, len(_GRAY_COLORS) - 1)]
 
 
 def _group_children_by_config(
     children: List[Resource], 
-    config: Dict[str, Any]
+    resource_configs: Dict[str, Dict[str, Any]]
 ) -> Dict[str, List[Resource]]:
     """
     Group children resources by their grouped_by configuration.
     
     Args:
         children: List of child resources
-        config: Configuration dictionary
+        resource_configs: Per-type configuration (see get_resource_configs_by_type)
         
     Returns:
         Dictionary mapping group key to list of resources
@@ -726,35 +976,72 @@ def _group_children_by_config(
     grouped: Dict[str, List[Resource]] = {}
     
     for child in children:
-        child_config = get_resource_config(config, child.resource_type)
+        child_config = resource_configs[child.resource_type]
         
         if child_config and 'grouped_by' in child_config:
             grouped_by = child_config['grouped_by']
             if grouped_by:
                 # Build group key from first grouped_by field
                 first_field = grouped_by[0]
-                value = child.get_value(first_field)
-                group_key = str(value).lower() if value is not None else 'unknown'
+                group_key = child.get_value_lower(first_field)
             else:
                 group_key = 'default'
         else:
             group_key = 'default'
         
-        if group_key not in grouped:
-            grouped[group_key] = []
-        grouped[group_key].append(child)
+        grouped.setdefault(group_key, []).append(child)
     
     return grouped
 
 
+def _render_child_nodes(
+    graph: _DotGraph,
+    children: List[Resource],
+    display_names: Dict[Resource, str],
+    node_ids: Dict[str, str],
+    node_counter: int,
+    node_label_parts: Dict[str, Tuple[str, str]]
+) -> Tuple[List[str], Dict[str, str], int]:
+    """
+    Render child resources as nodes directly into a graph/cluster.
+    
+    Args:
+        graph: The graph/cluster to render into
+        children: Child resources to render
+        display_names: Dictionary of resource -> display name
+        node_ids: Dictionary to track node IDs
+        node_counter: Current node counter
+        node_label_parts: Dictionary of resource_type -> (prefix, suffix) node label parts
+        
+    Returns:
+        Tuple of (new node IDs in order, node_id -> resource_type mapping, updated node counter)
+    """
+    child_node_ids: List[str] = []
+    child_node_types: Dict[str, str] = {}
+    child_nodes: List[Tuple[str, str]] = []
+    for child in children:
+        child_node_id = f'node_{node_counter}'
+        node_counter += 1
+        # Use resource.address as the unique key
+        node_ids[child.address] = child_node_id
+        child_node_ids.append(child_node_id)
+        child_node_types[child_node_id] = child.resource_type
+        
+        label_prefix, label_suffix = node_label_parts[child.resource_type]
+        child_nodes.append((child_node_id, f'{label_prefix}{_escape_html(display_names[child])}{label_suffix}'))
+    graph.html_nodes(child_nodes)
+    
+    return child_node_ids, child_node_types, node_counter
+
+
 def _render_grouped_children(
     parent_graph,
     grouped_children: Dict[str, List[Resource]],
-    config: Dict[str, Any],
+    display_names: Dict[Resource, str],
     node_ids: Dict[str, str],
     all_child_node_ids: List[str],
     node_counter: int,
-    max_widths_per_type: Dict[str, int],
+    node_label_parts: Dict[str, Tuple[str, str]],
     depth: int = 2,
     node_types: Optional[Dict[str, str]] = None
 ) -> int:
@@ -764,11 +1051,11 @@ def _render_grouped_children(
     Args:
         parent_graph: The parent graph/cluster to render into
         grouped_children: Dictionary of group_key -> resources
-        config: Configuration dictionary
+        display_names: Dictionary of resource -> display name
         node_ids: Dictionary to track node IDs
         all_child_node_ids: List to collect all child node IDs for layout
         node_counter: Current node counter
-        max_widths_per_type: Dictionary of resource_type -> max width
+        node_label_parts: Dictionary of resource_type -> (prefix, suffix) node label parts
         depth: Current nesting depth for gray color
         node_types: Optional dictionary to track node_id -> resource_type mapping
         
@@ -777,23 +1064,13 @@ def _render_grouped_children(
     """
     # If only one group (or all 'default'), render directly without sub-clustering
     if len(grouped_children) == 1:
-        group_key, children = list(grouped_children.items())[0]
-        for child in children:
-            child_node_id = f'node_{node_counter}'
-            node_counter += 1
-            # Use resource.address as the unique key
-            node_ids[child.address] = child_node_id
-            all_child_node_ids.append(child_node_id)
-            if node_types is not None:
-                node_types[child_node_id] = child.resource_type
-            
-            child_config = get_resource_config(config, child.resource_type)
-            child_display_name = get_display_name(child, child_config)
-            child_icon_path = child_config.get('diagram_image', '')
-            
-            text_width = max_widths_per_type.get(child.resource_type)
-            child_label = _create_node_label(child.resource_type, child_display_name, child_icon_path, text_width)
-            parent_graph.node(child_node_id, label=child_label)
+        children = next(iter(grouped_children.values()))
+        child_node_ids, child_node_types, node_counter = _render_child_nodes(
+            parent_graph, children, display_names, node_ids, node_counter, node_label_parts
+        )
+        all_child_node_ids.extend(child_node_ids)
+        if node_types is not None:
+            node_types.update(child_node_types)
     else:
         # Multiple groups - create sub-clusters for each
         # Track first node from each sub-cluster for vertical stacking
@@ -803,33 +1080,23 @@ def _render_grouped_children(
         defaultish_node_ids: List[str] = []
         defaultish_node_types: Dict[str, str] = {}
         
-        for group_key, children in sorted(grouped_children.items()):
+        for group_key in sorted(grouped_children):
+            children = grouped_children[group_key]
             if group_key == 'default' or group_key == 'unknown':
                 # Render default/unknown directly without a sub-cluster
-                for child in children:
-                    child_node_id = f'node_{node_counter}'
-                    node_counter += 1
-                    # Use resource.address as the unique key
-                    node_ids[child.address] = child_node_id
-                    all_child_node_ids.append(child_node_id)
-                    if node_types is not None:
-                        node_types[child_node_id] = child.resource_type
-                    
-                    # Track for layout application
-                    defaultish_node_ids.append(child_node_id)
-                    defaultish_node_types[child_node_id] = child.resource_type
-                    
-                    child_config = get_resource_config(config, child.resource_type)
-                    child_display_name = get_display_name(child, child_config)
-                    child_icon_path = child_config.get('diagram_image', '')
-                    
-                    text_width = max_widths_per_type.get(child.resource_type)
-                    child_label = _create_node_label(child.resource_type, child_display_name, child_icon_path, text_width)
-                    parent_graph.node(child_node_id, label=child_label)
+                child_node_ids, child_node_types, node_counter = _render_child_nodes(
+                    parent_graph, children, display_names, node_ids, node_counter, node_label_parts
+                )
+                all_child_node_ids.extend(child_node_ids)
+                if node_types is not None:
+                    node_types.update(child_node_types)
+                
+                # Track for layout application
+                defaultish_node_ids.extend(child_node_ids)
+                defaultish_node_types.update(child_node_types)
             else:
                 # Create a sub-cluster for this group
-                # Use node_counter to ensure uniqueness across different parent contexts
-                sub_cluster_name = f'cluster_grouped_{abs(hash(group_key))}_{node_counter}'
+                sub_cluster_name = parent_graph.unique_name('cluster_grouped')
                 
                 with parent_graph.subgraph(name=sub_cluster_name) as sub_cluster:
                     # Format the group label nicely with bold styling
@@ -845,26 +1112,12 @@ def _render_grouped_children(
                                    fillcolor=gray_color, penwidth='1.0')
                     sub_cluster.attr(margin='16')
                     
-                    group_node_ids: List[str] = []
-                    group_node_types: Dict[str, str] = {}
-                    for child in children:
-                        child_node_id = f'node_{node_counter}'
-                        node_counter += 1
-                        # Use resource.address as the unique key
-                        node_ids[child.address] = child_node_id
-                        group_node_ids.append(child_node_id)
-                        all_child_node_ids.append(child_node_id)
-                        if node_types is not None:
-                            node_types[child_node_id] = child.resource_type
-                        group_node_types[child_node_id] = child.resource_type
-                        
-                        child_config = get_resource_config(config, child.resource_type)
-                        child_display_name = get_display_name(child, child_config)
-                        child_icon_path = child_config.get('diagram_image', '')
-                        
-                        text_width = max_widths_per_type.get(child.resource_type)
-                        child_label = _create_node_label(child.resource_type, child_display_name, child_icon_path, text_width)
-                        sub_cluster.node(child_node_id, label=child_label)
+                    group_node_ids, group_node_types, node_counter = _render_child_nodes(
+                        sub_cluster, children, display_names, node_ids, node_counter, node_label_parts
+                    )
+                    all_child_node_ids.extend(group_node_ids)
+                    if node_types is not None:
+                        node_types.update(group_node_types)
                     
                     # Layout by type (same type vertical, different types horizontal)
                     if group_node_ids:
@@ -878,9 +1131,7 @@ def _render_grouped_children(
         
         # Stack sub-clusters vertically with invisible edges
         if len(sub_cluster_first_nodes) > 1:
-            for i in range(len(sub_cluster_first_nodes) - 1):
-                parent_graph.edge(sub_cluster_first_nodes[i], sub_cluster_first_nodes[i + 1], 
-                                style='invis', weight='10')
+            parent_graph.invisible_chain(sub_cluster_first_nodes, '10')
     
     return node_counter
 
@@ -919,78 +1170,97 @@ def _escape_html(text: str) -> str:
     Returns:
         HTML-escaped text
     """
+    # Most names contain none of these, so skip the replace passes for them
+    if '&' not in text and '<' not in text and '>' not in text:
+        return text
     return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
 
 
-def _create_node_label(resource_type: str, display_name: str, icon_path: str = '', 
-                       custom_text_width: Optional[int] = None) -> str:
+def _resolve_icon_path(icon_path: str) -> Optional[str]:
+    """
+    Resolve an icon path to an absolute path.
+    
+    Relative paths depend on the current working directory, so results are
+    only memoized within a single generate_diagram call, never globally.
+    
+    Args:
+        icon_path: Path to the icon image
+        
+    Returns:
+        Absolute path string, or None if the file does not exist
+    """
+    resolved_path = Path(icon_path).resolve()
+    return str(resolved_path) if resolved_path.exists() else None
+
+
+@lru_cache(maxsize=1024)
+def _create_node_label_parts(resource_type: str, icon_abs_path: Optional[str] = None,
+                             custom_text_width: Optional[int] = None) -> Tuple[str, str]:
     """
-    Create an HTML-like label for a node with optional icon, resource type, and name.
-    Modern cloud diagram aesthetics with shadows and depth.
-    All nodes have a fixed minimum width for uniform alignment.
+    Create the parts of a node's HTML-like label that surround the display name.
     
-    NOTE: display_name is shown as the main (big, bold) name at the top,
-    resource_type is shown as the smaller subtitle below.
+    Labels are modern cloud diagram cards with an optional icon. The display
+    name is shown as the main (big, bold) name at the top, and the resource type
+    as the smaller subtitle below. All nodes have a fixed minimum width for
+    uniform alignment.
+    
+    Everything except the display name depends only on the resource type's
+    configuration, so this is computed once per type and shared by all its nodes.
+    The full label is prefix + _escape_html(display_name) + suffix.
     
     Args:
         resource_type: The resource type (shown as small subtitle)
-        display_name: The display name (shown as big bold name)
-        icon_path: Path to the icon image (optional)
+        icon_abs_path: Absolute path of an existing icon image, from _resolve_icon_path (optional)
         custom_text_width: Optional custom width for text cell in pixels (for uniform sizing per type)
         
     Returns:
-        HTML-like label string for Graphviz
+        Tuple of (prefix, suffix) to place before and after the escaped display name
     """
     # Use provided width or fallback to default
     cell_width = custom_text_width if custom_text_width is not None else MIN_TEXT_CELL_WIDTH
     
     # Escape special characters in text for HTML
-    # Don't truncate resource type and display name - show full names
+    # Don't truncate resource type - show full names
     resource_type_escaped = _escape_html(resource_type)
-    display_name_escaped = _escape_html(display_name)
 
+    # If the icon doesn't exist, don't show a placeholder - just skip the icon cell
+    # This avoids issues with emoji rendering in Graphviz
     icon_cell = ''
-    if icon_path:
-        icon_abs_path = Path(icon_path).resolve()
-        if icon_abs_path.exists():
-            # Use WIDTH and HEIGHT without FIXEDSIZE to allow content to expand if needed
-            icon_cell = (
-                f'<TD WIDTH="{ICON_CELL_WIDTH}" HEIGHT="{ICON_CELL_WIDTH}" BGCOLOR="#f5f5f5">'
-                f'<IMG SRC="{icon_abs_path}" SCALE="TRUE"/>'
-                f'</TD>'
-            )
-        else:
-            # If icon doesn't exist, don't show a placeholder - just skip the icon cell
-            # This avoids issues with emoji rendering in Graphviz
-            icon_cell = ''
+    if icon_abs_path:
+        # Use WIDTH and HEIGHT without FIXEDSIZE to allow content to expand if needed
+        icon_cell = (
+            f'<TD WIDTH="{ICON_CELL_WIDTH}" HEIGHT="{ICON_CELL_WIDTH}" BGCOLOR="#f5f5f5">'
+            f'<IMG SRC="{icon_abs_path}" SCALE="TRUE"/>'
+            f'</TD>'
+        )
+
+    suffix = f'''</B></FONT><BR/>
+      <FONT POINT-SIZE="11" COLOR="#6b7280">{resource_type_escaped}</FONT>
+    </TD>
+  </TR>
+</TABLE>>'''
 
     if icon_cell:
         # Node with icon - modern card-like appearance
         # display_name (big, bold) on top, resource_type (small) below
         # Fixed WIDTH on text cell ensures uniform box sizes for alignment
-        return f'''<
+        prefix = f'''<
 <TABLE BORDER="0" CELLBORDER="0" CELLSPACING="0" CELLPADDING="12" BGCOLOR="white" STYLE="rounded">
   <TR>
     {icon_cell}
     <TD WIDTH="{cell_width}" ALIGN="LEFT" BALIGN="LEFT" CELLPADDING="8">
-      <FONT POINT-SIZE="16" COLOR="#1f2937"><B>{display_name_escaped}</B></FONT><BR/>
-      <FONT POINT-SIZE="11" COLOR="#6b7280">{resource_type_escaped}</FONT>
-    </TD>
-  </TR>
-</TABLE>>'''
+      <FONT POINT-SIZE="16" COLOR="#1f2937"><B>'''
+        return prefix, suffix
     
     # No icon version - clean, modern card
     # display_name (big, bold) on top, resource_type (small) below
     # Fixed WIDTH ensures uniform box sizes for alignment
-    return f'''<
+    prefix = f'''<
 <TABLE BORDER="0" CELLBORDER="0" CELLSPACING="0" CELLPADDING="16" BGCOLOR="white" STYLE="rounded">
   <TR>
     <TD WIDTH="{cell_width + ICON_CELL_WIDTH}" ALIGN="CENTER" BALIGN="CENTER">
-      <FONT POINT-SIZE="16" COLOR="#1f2937"><B>{display_name_escaped}</B></FONT><BR/>
-      <FONT POINT-SIZE="11" COLOR="#6b7280">{resource_type_escaped}</FONT>
-    </TD>
-  </TR>
-</TABLE>>'''
+      <FONT POINT-SIZE="16" COLOR="#1f2937"><B>'''
+    return prefix, suffix
 
 
 def _shorten_path_name(name: str) -> str:
@@ -1008,7 +1278,7 @@ def _shorten_path_name(name: str) -> str:
     """
     # Apply the shortening logic (only if name starts with "projects/")
     if name.startswith('projects/'):
-        return name.rsplit('/', 1)[-1]
+        return name.rpartition('/')[2]
     return name
 
 
@@ -1025,7 +1295,7 @@ def _format_outer_group_label(group_key: Tuple[str, ...]) -> str:
     """
     if not group_key:
         return 'Resources'
-    elif group_key == ('ungrouped',):
+    elif group_key == UNGROUPED_GROUP_KEY:
         return 'Ungrouped Resources'
     elif group_key == ('default',):
         return 'Default Group'
@@ -1066,14 +1336,14 @@ def _format_sub_group_label(sub_key: Tuple[str, ...]) -> str:
     
     # For multiple parts, show them as joined values (without resource type)
     # Skip if all values are 'unknown'
-    if all(v == 'unknown' for v in parts):
+    if parts.count('unknown') == len(parts):
         return ''
     
     # Shorten path-like values
     shortened_parts = [_shorten_path_name(p) for p in parts]
     return ' | '.join(shortened_parts)
 
-def _layout_nodes_by_type(g: Digraph, node_ids: List[str], node_types: Dict[str, str]) -> None:
+def _layout_nodes_by_type(g: _DotGraph, node_ids: List[str], node_types: Dict[str, str]) -> None:
     """
     Layout nodes so that resources of the same type are stacked vertically,
     and different types are placed side by side (horizontally).
@@ -1091,19 +1361,16 @@ def _layout_nodes_by_type(g: Digraph, node_ids: List[str], node_types: Dict[str,
     type_groups: Dict[str, List[str]] = {}
     for node_id in node_ids:
         resource_type = node_types.get(node_id, 'unknown')
-        if resource_type not in type_groups:
-            type_groups[resource_type] = []
-        type_groups[resource_type].append(node_id)
+        type_groups.setdefault(resource_type, []).append(node_id)
     
     # Sort type groups for consistent ordering
-    sorted_types = sorted(type_groups.keys())
+    sorted_types = sorted(type_groups)
     
     # If all nodes are the same type, stack them vertically
     if len(sorted_types) == 1:
         nodes = type_groups[sorted_types[0]]
         # Stack vertically with invisible edges
-        for i in range(len(nodes) - 1):
-            g.edge(nodes[i], nodes[i + 1], style='invis', weight='10')
+        g.invisible_chain(nodes, '10')
         return
     
     # Multiple types: place different types side by side (horizontally)
@@ -1113,22 +1380,17 @@ def _layout_nodes_by_type(g: Digraph, node_ids: List[str], node_types: Dict[str,
     first_nodes = [type_groups[t][0] for t in sorted_types]
     
     # Put first nodes of each type on the same rank (horizontal alignment)
-    with g.subgraph(name=f'rank_types_{abs(hash(tuple(first_nodes)))}') as rg:
-        rg.attr(rank='same')
-        for nid in first_nodes:
-            rg.node(nid)
+    g.same_rank(g.unique_name('rank_types'), first_nodes)
     
     # Add invisible edges between first nodes to maintain horizontal order
-    for i in range(len(first_nodes) - 1):
-        g.edge(first_nodes[i], first_nodes[i + 1], style='invis', weight='15')
+    g.invisible_chain(first_nodes, '15')
     
     # Stack nodes of the same type vertically
     for resource_type in sorted_types:
         nodes = type_groups[resource_type]
-        for i in range(len(nodes) - 1):
-            g.edge(nodes[i], nodes[i + 1], style='invis', weight='10')
+        g.invisible_chain(nodes, '10')
 
-def _layout_nodes_in_grid(g: Digraph, node_ids: List[str], max_cols: int = 3) -> None:
+def _layout_nodes_in_grid(g: _DotGraph, node_ids: List[str], max_cols: int = 3) -> None:
     """
     Force a wrapped/grid layout inside a (sub)graph by adding invisible edges
     and 'rank=same' rows. Prevents the 'everything in one line' layout.
@@ -1155,25 +1417,18 @@ def _layout_nodes_in_grid(g: Digraph, node_ids: List[str], max_cols: int = 3) ->
 
     # Put nodes of each row on same rank
     for r_idx, row in enumerate(rows):
-        with g.subgraph(name=f'rank_row_{abs(hash(tuple(row)))}') as rg:
-            rg.attr(rank='same')
-            for nid in row:
-                rg.node(nid)
+        g.same_rank(g.unique_name('rank_row'), row)
 
         # Keep order inside the row with invisible edges
-        for i in range(len(row) - 1):
-            g.edge(row[i], row[i + 1], style='invis', weight='15')
+        g.invisible_chain(row, '15')
 
     # Stack rows top->bottom with invisible edges for proper alignment
-    for r_idx in range(len(rows) - 1):
-        a = rows[r_idx][0]
-        b = rows[r_idx + 1][0]
-        g.edge(a, b, style='invis', weight='5')
+    g.invisible_chain([row[0] for row in rows], '5')
 
 def _ellipsize(s: str, n: int = 42) -> str:
     return s if len(s) <= n else s[: n - 1] + "…"
 
-def _layout_anchors_by_fieldname(g: Digraph, anchors_with_field: List[Tuple[str, Optional[str]]]) -> None:
+def _layout_anchors_by_fieldname(g: _DotGraph, anchors_with_field: List[Tuple[str, Optional[str]]]) -> None:
     """
     anchors_with_field: [(anchor_node_id, field_name), ...]
     Same field_name => vertical column
@@ -1196,15 +1451,10 @@ def _layout_anchors_by_fieldname(g: Digraph, anchors_with_field: List[Tuple[str,
     # 1) vertical stacking inside each column
     for key in col_order:
         col = columns[key]
-        for i in range(len(col) - 1):
-            g.edge(col[i], col[i + 1], style="invis", weight="10")
+        g.invisible_chain(col, '10')
 
     # 2) horizontal alignment of the first node of each column
     first_nodes = [columns[key][0] for key in col_order if columns[key]]
     if len(first_nodes) > 1:
-        with g.subgraph(name=f"rank_cols_{abs(hash(tuple(first_nodes)))}") as rg:
-            rg.attr(rank="same")
-            for nid in first_nodes:
-                rg.node(nid)
-        for i in range(len(first_nodes) - 1):
-            g.edge(first_nodes[i], first_nodes[i + 1], style="invis", weight="15")
+        g.same_rank(g.unique_name('rank_cols'), first_nodes)
+        g.invisible_chain(first_nodes, '15')
@@ -0,0 +1,40 @@
+"""Tests for the Terraform plan parser."""
+
+import math
+
+from terravisualizer.plan_parser import parse_terraform_plan
+
+
+def _write_plan(tmp_path, after: str):
+    """Write a plan with a single resource change whose 'after' values are given as raw JSON."""
+    plan_file = tmp_path / "plan.json"
+    plan_file.write_text(
+        '{"resource_changes": [{"address": "google_project.p", "type": "google_project", '
+        '"name": "p", "change": {"after": ' + after + '}}]}'
+    )
+    return str(plan_file)
+
+
+def test_integers_wider_than_64_bits_are_kept_exact(tmp_path):
+    plan_path = _write_plan(
+        tmp_path,
+        '{"big": 123456789012345678901234567890, "over_u64": 18446744073709551616, '
+        '"under_i64": -9223372036854775809, "small": 42}',
+    )
+
+    (resource,) = parse_terraform_plan(plan_path)
+
+    assert resource.values["big"] == 123456789012345678901234567890
+    assert resource.values["over_u64"] == 2 ** 64
+    assert resource.values["under_i64"] == -(2 ** 63) - 1
+    assert all(isinstance(value, int) for value in resource.values.values())
+
+
+def test_nan_and_infinity_tokens_are_accepted(tmp_path):
+    plan_path = _write_plan(tmp_path, '{"nan": NaN, "inf": Infinity, "ninf": -Infinity}')
+
+    (resource,) = parse_terraform_plan(plan_path)
+
+    assert math.isnan(resource.values["nan"])
+    assert resource.values["inf"] == math.inf
+    assert resource.values["ninf"] == -math.inf